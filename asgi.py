@@ -0,0 +1,250 @@
+"""Async serving mode: the users/products/orders CRUD routes on Quart with AsyncSession.
+
+Run with any ASGI server, e.g. ``hypercorn asgi:app`` or ``uvicorn asgi:app``. The synchronous
+Flask app in app.py keeps working unchanged (``gunicorn app:app``).
+
+This mode needs packages the sync app doesn't: ``quart``, ``greenlet`` (every AsyncSession call
+runs through it), the async driver for the database (``aiosqlite`` for SQLite, ``asyncmy`` for
+MySQL) and an ASGI server::
+
+    pip install quart greenlet aiosqlite asyncmy hypercorn
+"""
+import os
+
+from quart import Quart, request, jsonify, url_for
+from marshmallow import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+# The product cache is read through the module so a backend swapped in app.py applies here too
+import app as sync_app
+from app import (
+    DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_PRE_PING, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT,
+    Association, Order, Product, User, add_next_cursor, apply_sales_rollup, decode_page_entry, encode_page_entry,
+    get_page_args, invalidate_cache, item_cache_key, json_encoder, keyset_select, order_schema, order_serializer,
+    page_cache_key, product_schema, product_serializer, user_schema, user_serializer,
+)
+
+# Async drivers used in place of the sync DBAPI drivers in DATABASE_URL
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'mysql': 'asyncmy'}
+
+# Helper function to derive the async database URL from the sync one
+def async_database_url(url=DATABASE_URL):
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    return url.set(drivername=f'{url.get_backend_name()}+{driver}') if driver else url
+
+# Helper function to create the async engine with the same pool settings as the sync one
+def create_async_db_engine(url=None):
+    url = make_url(url or os.environ.get('ASYNC_DATABASE_URL') or async_database_url())
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return create_async_engine(url, poolclass=StaticPool)
+    # Some async dialects default to NullPool (aiosqlite for file databases), so the pool is set explicitly
+    return create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+# Initialize the async engine; objects stay usable after commit since lazy refreshes can't run here
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+# Initialize Quart app
+app = Quart(__name__)
+
+# Close pooled connections on shutdown; aiosqlite keeps a thread per open connection
+@app.after_serving
+async def dispose_engine():
+    await async_engine.dispose()
+
+# Helper function to manage session context
+def get_session():
+    return AsyncSessionLocal()
+
+# Helper function to encode serializer output the same way as the sync app
+def json_response(data, status=200):
+    return app.response_class(json_encoder.encode(data) + '\n', status=status, mimetype='application/json')
+
+# Generic function for GET or 404
+async def get_connection_or_404(model, model_id, serializer, cache=None):
+    key = item_cache_key(model, model_id)
+    if cache is not None:
+        body = cache.get(key)
+        if body is not None:
+            return app.response_class(body, mimetype='application/json')
+
+    async with get_session() as session:
+        row = (await session.execute(select(*serializer.columns).where(model.id == model_id))).first()
+        if not row:
+            return jsonify({"error": f"{model.__name__} not found"}), 404
+        response = json_response(serializer.dump(row))
+        if cache is not None:
+            cache.set(key, await response.get_data())
+        return response
+
+# Generic function for getting a page of instances
+async def get_all_connections(model, serializer, cache=None):
+    after, limit = get_page_args(args=request.args)
+    key = page_cache_key(model, after, limit)
+    if cache is not None:
+        entry = cache.get(key)
+        if entry is not None:
+            next_after, body = decode_page_entry(entry)
+            response = app.response_class(body, mimetype='application/json')
+            return add_next_cursor(response, next_after, limit, request, url_for)
+
+    async with get_session() as session:
+        rows = (await session.execute(keyset_select(model, serializer, after, limit + 1))).all()
+        connections = serializer.dump_many(rows[:limit])
+        next_after = connections[-1]['id'] if len(rows) > limit else None
+        response = json_response(connections)
+        if cache is not None:
+            cache.set(key, encode_page_entry(next_after, await response.get_data()))
+        return add_next_cursor(response, next_after, limit, request, url_for)
+
+# Generic function for creating an instance
+async def create_connection(model, data, schema):
+    async with get_session() as session:
+        try:
+            connection = schema.load(data)
+            session.add(connection)
+            await session.commit()
+            # Reload server-side defaults before dumping
+            await session.refresh(connection)
+            return jsonify(schema.dump(connection)), 201
+        except ValidationError as err:
+            return jsonify(err.messages), 400
+
+# Generic function for updating an instance
+async def update_connection(model, model_id, data, schema):
+    async with get_session() as session:
+        connection = await session.get(model, model_id)
+        if not connection:
+            return jsonify({"error": f"{model.__name__} not found"}), 404
+        try:
+            # Loaded without a session, which load() can't use through AsyncSession
+            type(schema)(transient=True).load(data, instance=connection)
+            await session.commit()
+            return jsonify(schema.dump(connection)), 200
+        except ValidationError as err:
+            return jsonify(err.messages), 400
+
+# Generic function for deleting an instance
+async def delete_connection(model, model_id):
+    async with get_session() as session:
+        # Relationships are loaded up front since the flush can't lazy load them in async mode
+        options = [selectinload(relationship) for relationship in model.__mapper__.relationships]
+        connection = await session.get(model, model_id, options=options)
+        if not connection:
+            return jsonify({"error": f"{model.__name__} not found"}), 404
+        await session.delete(connection)
+        await session.commit()
+        return jsonify({"message": f"{model.__name__} deleted"}), 200
+
+# Routes for Users
+@app.route('/users', methods=['GET'])
+async def get_users():
+    return await get_all_connections(User, user_serializer)
+
+@app.route('/users/<int:user_id>', methods=['GET'])
+async def get_user(user_id):
+    return await get_connection_or_404(User, user_id, user_serializer)
+
+@app.route('/users', methods=['POST'])
+async def create_user():
+    data = await request.get_json()
+    return await create_connection(User, data, user_schema)
+
+@app.route('/users/<int:user_id>', methods=['PUT'])
+async def update_user(user_id):
+    data = await request.get_json()
+    return await update_connection(User, user_id, data, user_schema)
+
+@app.route('/users/<int:user_id>', methods=['DELETE'])
+async def delete_user(user_id):
+    return await delete_connection(User, user_id)
+
+# Routes for Products
+@app.route('/products', methods=['GET'])
+async def get_products():
+    return await get_all_connections(Product, product_serializer, cache=sync_app.product_cache)
+
+@app.route('/products/<int:product_id>', methods=['GET'])
+async def get_product(product_id):
+    return await get_connection_or_404(Product, product_id, product_serializer, cache=sync_app.product_cache)
+
+@app.route('/products', methods=['POST'])
+async def create_product():
+    data = await request.get_json()
+    response = await create_connection(Product, data, product_schema)
+    invalidate_cache(sync_app.product_cache, Product)
+    return response
+
+@app.route('/products/<int:product_id>', methods=['PUT'])
+async def update_product(product_id):
+    data = await request.get_json()
+    response = await update_connection(Product, product_id, data, product_schema)
+    invalidate_cache(sync_app.product_cache, Product, product_id)
+    return response
+
+@app.route('/products/<int:product_id>', methods=['DELETE'])
+async def delete_product(product_id):
+    response = await delete_connection(Product, product_id)
+    invalidate_cache(sync_app.product_cache, Product, product_id)
+    return response
+
+# Routes for Orders
+@app.route('/orders', methods=['GET'])
+async def get_orders():
+    return await get_all_connections(Order, order_serializer)
+
+@app.route('/orders', methods=['POST'])
+async def create_order():
+    data = await request.get_json()
+    if not data.get('user_id') or not data.get('product_ids'):
+        return jsonify({"error": "Missing user_id or product_ids"}), 400
+
+    async with get_session() as session:
+        product_ids = (await session.scalars(select(Product.id).where(Product.id.in_(data['product_ids'])))).all()
+        if not product_ids:
+            return jsonify({"error": "Some products not found"}), 404
+
+        order = Order(user_id=data['user_id'])
+        session.add(order)
+        await session.flush()
+        await session.execute(insert(Association.__table__),
+                              [{"order_id": order.id, "product_id": product_id} for product_id in product_ids])
+        await session.run_sync(apply_sales_rollup, [order.id], 1)
+        await session.commit()
+        await session.refresh(order)
+        return jsonify(order_schema.dump(order)), 201
+
+@app.route('/orders/<int:order_id>', methods=['GET'])
+async def get_order(order_id):
+    return await get_connection_or_404(Order, order_id, order_serializer)
+
+@app.route('/orders/<int:order_id>', methods=['PUT'])
+async def update_order(order_id):
+    data = await request.get_json()
+    return await update_connection(Order, order_id, data, order_schema)
+
+@app.route('/orders/<int:order_id>', methods=['DELETE'])
+async def delete_order(order_id):
+    return await delete_connection(Order, order_id)
+
+# Error handling
+@app.errorhandler(400)
+async def bad_request(error):
+    return jsonify({'error': 'Bad Request', 'message': error.description}), 400
+
+@app.errorhandler(404)
+async def not_found(error):
+    return jsonify({'error': 'Not Found', 'message': error.description}), 404
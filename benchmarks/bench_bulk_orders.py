@@ -0,0 +1,89 @@
+"""Compare order ingestion rate of POST /orders against POST /orders/bulk.
+
+Runs both paths through the Flask test client against a throwaway SQLite
+database and prints orders/sec and association rows/sec for each.
+
+SQLite supports INSERT ... RETURNING, so the bulk path batches order rows
+here as well as association rows. MySQL does not: there the flush sends
+one INSERT per order and only the association rows are batched, so expect
+a smaller speedup than this benchmark reports.
+
+    python benchmarks/bench_bulk_orders.py --orders 5000 --products-per-order 3
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import app as ecommerce  # noqa: E402
+
+
+def setup_database(path, users, products):
+    engine = create_engine(f'sqlite:///{path}')
+    ecommerce.Base.metadata.create_all(engine)
+    ecommerce.Session.configure(bind=engine)
+    with ecommerce.get_session() as session:
+        session.add_all(ecommerce.User(name=f'user{i}', email=f'user{i}@example.com', address=f'{i} Main St')
+                        for i in range(users))
+        session.add_all(ecommerce.Product(product_name=f'product{i}', price=float(i % 100))
+                        for i in range(products))
+        session.commit()
+    return engine
+
+
+def make_payload(count, users, products, per_order):
+    rng = random.Random(42)
+    return [{"user_id": rng.randint(1, users), "product_ids": rng.sample(range(1, products + 1), per_order)}
+            for _ in range(count)]
+
+
+def bench_single(client, payload):
+    start = time.perf_counter()
+    for item in payload:
+        response = client.post('/orders', json=item)
+        assert response.status_code == 201, response.get_json()
+    return time.perf_counter() - start
+
+
+def bench_bulk(client, payload, batch_size):
+    start = time.perf_counter()
+    for offset in range(0, len(payload), batch_size):
+        response = client.post('/orders/bulk', json=payload[offset:offset + batch_size])
+        assert response.status_code == 201, response.get_json()
+    return time.perf_counter() - start
+
+
+def report(label, elapsed, orders, rows):
+    print(f'{label:<12} {elapsed:8.3f}s {orders / elapsed:12.0f} orders/s {rows / elapsed:12.0f} rows/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--products-per-order', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=ecommerce.MAX_BULK_ORDERS)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--products', type=int, default=1000)
+    args = parser.parse_args()
+
+    payload = make_payload(args.orders, args.users, args.products, args.products_per_order)
+    rows = args.orders * args.products_per_order
+    client = ecommerce.app.test_client()
+
+    for label, run in (('per-order', lambda: bench_single(client, payload)),
+                       ('bulk', lambda: bench_bulk(client, payload, args.batch_size))):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = setup_database(os.path.join(tmp, 'bench.db'), args.users, args.products)
+            report(label, run(), args.orders, rows)
+            if label == 'bulk' and not engine.dialect.insert_executemany_returning:
+                print(f'note: {engine.dialect.name} has no INSERT ... RETURNING, order rows were inserted one by one')
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Compare GET /products/search latency with fetching every product and filtering on the client.
+
+Seeds a SQLite database with --products rows (1M by default, reused between runs), then times a
+set of type-ahead and price-range queries both ways and prints p50/max latency in milliseconds.
+
+    python benchmarks/bench_product_search.py --products 1000000 --db /tmp/search.db
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine, insert
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import app as ecommerce  # noqa: E402
+
+WORDS = ['red', 'blue', 'green', 'black', 'cotton', 'wool', 'linen', 'shirt', 'shoe', 'sock', 'hat',
+         'jacket', 'jeans', 'scarf', 'glove', 'boot', 'sandal', 'belt', 'wallet', 'watch']
+
+QUERIES = [
+    {"q": "jack"},
+    {"q": "red sh", "sort": "price"},
+    {"q": "wool glo", "min_price": 10, "max_price": 50},
+    {"min_price": 99.5, "max_price": 100},
+    {"min_price": 20, "max_price": 30, "sort": "-price"},
+]
+
+
+def setup_database(path, count):
+    engine = create_engine(f'sqlite:///{path}')
+    ecommerce.Base.metadata.create_all(engine)
+    ecommerce.Session.configure(bind=engine)
+    with ecommerce.get_session() as session:
+        existing = session.query(ecommerce.Product).count()
+        rng = random.Random(42)
+        for offset in range(existing, count, 50000):
+            session.execute(insert(ecommerce.Product.__table__), [
+                {"product_name": f'{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(WORDS)} {i}',
+                 "price": round(rng.uniform(1, 100), 2)}
+                for i in range(offset, min(offset + 50000, count))
+            ])
+            session.commit()
+    return engine
+
+
+def matches(product, params):
+    terms = ecommerce.ProductSearchIndex.tokenize(params.get('q', ''))
+    tokens = ecommerce.ProductSearchIndex.tokenize(product['product_name'])
+    price = product['price']
+    return (all(any(token.startswith(term) for token in tokens) for term in terms)
+            and (params.get('min_price') is None or (price is not None and price >= params['min_price']))
+            and (params.get('max_price') is None or (price is not None and price <= params['max_price'])))
+
+
+def fetch_all(params):
+    # What clients had to do before the search endpoint: load everything and filter locally
+    with ecommerce.get_session() as session:
+        products = ecommerce.ProductSchema(many=True).dump(session.query(ecommerce.Product).all())
+    return [product for product in products if matches(product, params)][:ecommerce.DEFAULT_PAGE_LIMIT]
+
+
+def search(client, params):
+    response = client.get('/products/search', query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def time_calls(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=1000000)
+    parser.add_argument('--db', default='/tmp/ecommerce_search_bench.db')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--fetch-all-repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    engine = setup_database(args.db, args.products)
+    client = ecommerce.app.test_client()
+    start = time.perf_counter()
+    with ecommerce.get_session() as session:
+        ecommerce.product_search_index.build(session)
+    print(f'search index built over {args.products} products in {time.perf_counter() - start:.2f}s')
+
+    print(f'{"query":<55} {"search p50":>11} {"search max":>11} {"fetch-all p50":>14}')
+    for params in QUERIES:
+        search_p50, search_max = time_calls(lambda: search(client, params), args.repeat)
+        fetch_p50, _ = time_calls(lambda: fetch_all(params), args.fetch_all_repeat)
+        label = '&'.join(f'{key}={value}' for key, value in params.items())
+        print(f'{label:<55} {search_p50:>9.1f}ms {search_max:>9.1f}ms {fetch_p50:>12.1f}ms')
+    engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
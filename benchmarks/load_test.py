@@ -0,0 +1,113 @@
+"""Compare latency and throughput of the sync (WSGI) and async (ASGI) serving modes.
+
+Start both servers against the same database, then point the harness at them:
+
+    DATABASE_URL=sqlite:////tmp/load.db gunicorn -w 4 --threads 32 -b 127.0.0.1:8000 app:app
+    DATABASE_URL=sqlite:////tmp/load.db hypercorn -w 4 -b 127.0.0.1:8001 asgi:app
+    python benchmarks/load_test.py --target sync=http://127.0.0.1:8000 --target async=http://127.0.0.1:8001 \\
+        --path /users/1 --clients 1000 --duration 30
+
+The default path hits the database on every request. Product routes are served from the product
+cache, so they measure the cache rather than the session layer.
+
+Each client keeps one HTTP/1.1 keep-alive connection open and sends requests back to back. The
+client is plain asyncio with no third-party dependencies, so it adds little overhead of its own.
+1000 clients need ``ulimit -n`` above 1000 on the load generator.
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+
+    def percentile(self, fraction):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+async def client(host, port, request, deadline, stats):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            writer.write(request)
+            status, keep_alive = await read_response(reader)
+            stats.latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                stats.errors += 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+            stats.errors += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run_target(url, path, clients, duration):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    request = (f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: keep-alive\r\n\r\n').encode()
+    stats = Stats()
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(host, port, request, deadline, stats) for _ in range(clients)))
+    return stats, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', action='append', required=True, metavar='NAME=URL',
+                        help='server to test, may be given more than once')
+    parser.add_argument('--path', default='/users/1')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=30)
+    args = parser.parse_args()
+
+    print(f'{"mode":<10} {"requests":>10} {"errors":>8} {"req/s":>10} {"p50 ms":>10} {"p99 ms":>10}')
+    for target in args.target:
+        name, _, url = target.partition('=')
+        stats, elapsed = asyncio.run(run_target(url, args.path, args.clients, args.duration))
+        print(f'{name:<10} {len(stats.latencies):>10} {stats.errors:>8} {len(stats.latencies) / elapsed:>10.0f} '
+              f'{stats.percentile(0.50) * 1000:>10.1f} {stats.percentile(0.99) * 1000:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
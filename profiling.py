@@ -0,0 +1,247 @@
+"""Opt-in request profiling for the Flask app.
+
+Enable with ``PROFILING_ENABLED=1``. Each request then records per-route timing histograms, SQL
+statement count and time, ORM/row hydration counts and the time spent in instrumented helpers.
+The numbers are returned in a ``Server-Timing`` header and aggregated for ``GET /profiling``. The
+header is sent before the body, so for streamed responses it only covers the work done before
+streaming started; bodies wrapped with ``profiler.stream`` add their SQL, rows and duration to the
+``/profiling`` totals once they are exhausted. A ``PROFILING_SAMPLE_RATE`` fraction of requests also
+runs under cProfile, and the output of the ``PROFILING_SLOWEST`` slowest sampled requests is kept.
+Only one request per process is sampled at a time, since cProfile can't run concurrently on Python
+3.12+. When profiling is disabled nothing is registered and ``timed`` returns functions unchanged,
+so there is no overhead.
+"""
+import cProfile
+import functools
+import heapq
+import io
+import itertools
+import os
+import pstats
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() in ('1', 'true', 'yes', 'on')
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.01))
+PROFILING_SLOWEST = int(os.environ.get('PROFILING_SLOWEST', 10))
+
+# Upper bounds, in milliseconds, of the per-route latency histogram buckets
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+# Profile of the request being handled in the current thread or task
+current_profile = ContextVar('current_profile', default=None)
+
+# Held while a request runs under cProfile, which uses the single sys.monitoring profiler slot on 3.12+
+_cprofile_lock = threading.Lock()
+
+
+class RequestProfile:
+    """Measurements collected while handling one request."""
+
+    def __init__(self, profiler=None):
+        self.start = time.perf_counter()
+        self.timings = {}
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.rows = 0
+        self.profiler = profiler
+        self.route = None
+        self.streamed = False
+
+    def server_timing(self, total):
+        metrics = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.timings.items()]
+        metrics.append(f'sql;dur={self.sql_time * 1000:.2f};desc="{self.sql_count} queries, {self.rows} rows"')
+        metrics.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(metrics)
+
+
+class RouteStats:
+    """Aggregated latency histogram and SQL totals for one route."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(HISTOGRAM_BUCKETS_MS)
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.rows = 0
+
+    def add(self, duration, profile):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        duration_ms = duration * 1000
+        for index, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if duration_ms <= bound:
+                self.buckets[index] += 1
+                break
+        self.sql_count += profile.sql_count
+        self.sql_time += profile.sql_time
+        self.rows += profile.rows
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "histogram_ms": {"le": [bound if bound != float('inf') else '+Inf' for bound in HISTOGRAM_BUCKETS_MS],
+                             "counts": self.buckets},
+            "sql_statements": self.sql_count,
+            "sql_ms": self.sql_time * 1000,
+            "rows": self.rows,
+        }
+
+
+class Profiler:
+    """Collects request profiles for a Flask app and its SQLAlchemy engine."""
+
+    def __init__(self, enabled=PROFILING_ENABLED, sample_rate=PROFILING_SAMPLE_RATE, slowest=PROFILING_SLOWEST):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slowest = slowest
+        self.routes = {}
+        self.profiles = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def timed(self, name=None):
+        """Decorator adding the wrapped function's duration to the current request's timings."""
+        def decorator(func):
+            if not self.enabled:
+                return func
+            metric = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                profile = current_profile.get()
+                if profile is None:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profile.timings[metric] = profile.timings.get(metric, 0.0) + time.perf_counter() - start
+            return wrapper
+        return decorator
+
+    def add_rows(self, count):
+        profile = current_profile.get()
+        if profile is not None:
+            profile.rows += count
+
+    def stream(self, generator):
+        """Wrap a response body generator so the work it does counts toward the request's profile."""
+        profile = current_profile.get()
+        if profile is None:
+            return generator
+        profile.streamed = True
+
+        def wrapper():
+            # Depending on the Flask version teardown has already cleared the profile by now
+            token = current_profile.set(profile)
+            try:
+                yield from generator
+            finally:
+                current_profile.reset(token)
+                self._record(profile)
+        return wrapper()
+
+    def init_app(self, app, engine, base):
+        if not self.enabled:
+            return
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(base, 'load', self._on_load, propagate=True)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('profiling_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = conn.info['profiling_start'].pop()
+        profile = current_profile.get()
+        if profile is not None:
+            profile.sql_count += 1
+            profile.sql_time += time.perf_counter() - start
+
+    def _on_load(self, target, context):
+        self.add_rows(1)
+
+    def _before_request(self):
+        profiler = None
+        # Skip cProfile for this request if another one is already being sampled
+        if random.random() < self.sample_rate and _cprofile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except BaseException:
+                _cprofile_lock.release()
+                raise
+        current_profile.set(RequestProfile(profiler))
+
+    def _after_request(self, response):
+        profile = current_profile.get()
+        if profile is None:
+            return response
+        profile.route = f'{request.method} {request.url_rule.rule if request.url_rule else request.path}'
+        response.headers['Server-Timing'] = profile.server_timing(time.perf_counter() - profile.start)
+        return response
+
+    def _teardown_request(self, exception):
+        # Runs even when a handler or after_request fails, so the profiler is never left enabled
+        profile = current_profile.get()
+        if profile is None:
+            return
+        current_profile.set(None)
+        if profile.route is None:
+            profile.route = f'{request.method} {request.url_rule.rule if request.url_rule else request.path}'
+        if profile.profiler is not None:
+            profile.profiler.disable()
+            _cprofile_lock.release()
+            self._keep_if_slow(profile.route, time.perf_counter() - profile.start, profile.profiler)
+        # Streamed bodies are recorded by the stream() wrapper once they are exhausted
+        if not profile.streamed:
+            self._record(profile)
+
+    def _record(self, profile):
+        duration = time.perf_counter() - profile.start
+        with self._lock:
+            self.routes.setdefault(profile.route, RouteStats()).add(duration, profile)
+
+    def _keep_if_slow(self, route, duration, profiler):
+        with self._lock:
+            if self.slowest <= 0 or (len(self.profiles) >= self.slowest and duration <= self.profiles[0][0]):
+                return
+        # Render outside the lock, it is the expensive part
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(30)
+        entry = {"route": route, "duration_ms": duration * 1000, "recorded_at": time.time(),
+                 "profile": output.getvalue()}
+        with self._lock:
+            item = (duration, next(self._sequence), entry)
+            if len(self.profiles) < self.slowest:
+                heapq.heappush(self.profiles, item)
+            elif duration > self.profiles[0][0]:
+                heapq.heapreplace(self.profiles, item)
+
+    def stats(self):
+        if not self.enabled:
+            return {"enabled": False}
+        with self._lock:
+            return {
+                "enabled": True,
+                "sample_rate": self.sample_rate,
+                "routes": {route: stats.to_dict() for route, stats in sorted(self.routes.items())},
+                "slowest": [entry for _, _, entry in sorted(self.profiles, reverse=True)],
+            }
+
+
+profiler = Profiler()
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+# Run the app against a private in-memory SQLite database
+os.environ['DATABASE_URL'] = 'sqlite://'
+# Profiling hooks are registered at import, so enable them for the whole run; cProfile stays off
+os.environ['PROFILING_ENABLED'] = 'true'
+os.environ['PROFILING_SAMPLE_RATE'] = '0'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as ecommerce  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    ecommerce.Base.metadata.drop_all(ecommerce.engine)
+    ecommerce.Base.metadata.create_all(ecommerce.engine)
+    ecommerce.product_cache.delete_prefix('')
+    ecommerce.product_search_index.built_at = None
+    yield ecommerce
+    ecommerce.Base.metadata.drop_all(ecommerce.engine)
+
+
+@pytest.fixture
+def client(db):
+    return ecommerce.app.test_client()
+
+
+@pytest.fixture
+def count_queries():
+    """Return a callable that runs a function and returns (result, number of SQL statements)."""
+    def run(func, *args, **kwargs):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(ecommerce.engine, 'before_cursor_execute', record)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            event.remove(ecommerce.engine, 'before_cursor_execute', record)
+        return result, len(statements)
+    return run
+
+
+def seed(db, users=3, products=10):
+    with db.get_session() as session:
+        session.add_all(db.User(name=f'user{i}', email=f'user{i}@example.com') for i in range(users))
+        session.add_all(db.Product(product_name=f'product {i}', price=float(i + 1)) for i in range(products))
+        session.commit()
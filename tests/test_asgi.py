@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('quart')
+pytest.importorskip('aiosqlite')
+pytest.importorskip('greenlet')
+
+import asgi  # noqa: E402
+from app import Base, SalesRollup  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+
+def run(scenario):
+    """Run scenario(client) against the async app with a fresh in-memory database."""
+    async def main():
+        # test_app runs the serving hooks, which dispose the engine and so drop the database afterwards
+        async with asgi.app.test_app() as test_app:
+            async with asgi.async_engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            await scenario(test_app.test_client())
+    asyncio.run(main())
+
+
+async def json_of(response):
+    return await response.get_json()
+
+
+def test_user_crud(db):
+    async def scenario(client):
+        response = await client.post('/users', json={"name": "a", "email": "a@example.com"})
+        assert response.status_code == 201
+        assert await json_of(response) == {"address": None, "email": "a@example.com", "id": 1, "name": "a"}
+
+        response = await client.put('/users/1', json={"name": "b", "email": "a@example.com"})
+        assert (await json_of(response))["name"] == "b"
+        assert (await json_of(await client.get('/users/1')))["name"] == "b"
+
+        assert (await client.post('/users', json={"name": "c"})).status_code == 400
+        assert (await client.delete('/users/1')).status_code == 200
+        assert (await client.get('/users/1')).status_code == 404
+        assert (await client.put('/users/1', json={"name": "d"})).status_code == 404
+    run(scenario)
+
+
+def test_list_pages_follow_cursor(db):
+    async def scenario(client):
+        for index in range(5):
+            await client.post('/users', json={"name": f"u{index}", "email": f"u{index}@example.com"})
+
+        first = await client.get('/users?limit=2')
+        assert [user["id"] for user in await json_of(first)] == [1, 2]
+        assert first.headers['X-Next-Cursor'] == '2'
+        assert first.headers['Link'] == '<http://localhost/users?limit=2&after=2>; rel="next"'
+
+        last = await client.get('/users?after=4&limit=2')
+        assert [user["id"] for user in await json_of(last)] == [5]
+        assert 'Link' not in last.headers
+        assert (await client.get('/users?limit=0')).status_code == 400
+    run(scenario)
+
+
+def test_product_cache_is_shared_and_invalidated(db):
+    async def scenario(client):
+        await client.post('/products', json={"product_name": "p", "price": 2.0})
+        await client.get('/products/1')
+        await client.get('/products?limit=10')
+        assert db.product_cache.get('products:1') is not None
+        assert db.product_cache.get('products:list:None:10') is not None
+
+        await client.put('/products/1', json={"product_name": "p", "price": 5.0})
+        assert db.product_cache.get('products:1') is None
+        assert (await json_of(await client.get('/products/1')))["price"] == 5.0
+        assert (await json_of(await client.get('/products?limit=10')))[0]["price"] == 5.0
+
+        assert (await client.delete('/products/1')).status_code == 200
+        assert (await client.get('/products/1')).status_code == 404
+    run(scenario)
+
+
+def test_orders_update_the_sales_rollup(db):
+    async def scenario(client):
+        await client.post('/users', json={"name": "a", "email": "a@example.com"})
+        await client.post('/products', json={"product_name": "p", "price": 2.0})
+        await client.post('/products', json={"product_name": "q", "price": 3.0})
+
+        response = await client.post('/orders', json={"user_id": 1, "product_ids": [1, 2, 99]})
+        assert response.status_code == 201
+        assert (await json_of(await client.get('/orders/1')))["id"] == 1
+        assert (await client.post('/orders', json={"user_id": 1, "product_ids": [99]})).status_code == 404
+        assert (await client.post('/orders', json={"user_id": 1})).status_code == 400
+
+        async with asgi.get_session() as session:
+            day = (await session.execute(select(SalesRollup.order_count, SalesRollup.item_count, SalesRollup.revenue)
+                                         .where(SalesRollup.dimension == 'day'))).one()
+        assert tuple(day) == (1, 2, 5.0)
+
+        assert (await client.delete('/orders/1')).status_code == 200
+        async with asgi.get_session() as session:
+            day = (await session.execute(select(SalesRollup.order_count).where(SalesRollup.dimension == 'day'))).one()
+        assert tuple(day) == (0,)
+    run(scenario)
+
+
+def test_async_database_url_swaps_drivers():
+    assert str(asgi.async_database_url('sqlite:////tmp/x.db')) == 'sqlite+aiosqlite:////tmp/x.db'
+    assert str(asgi.async_database_url('mysql+mysqlconnector://u:p@h/db')) == 'mysql+asyncmy://u:***@h/db'
+    engine = asgi.create_async_db_engine('sqlite+aiosqlite:////tmp/x.db')
+    assert engine.pool.size() == asgi.DB_POOL_SIZE
@@ -0,0 +1,46 @@
+from conftest import seed
+
+
+def test_bulk_reports_per_item_errors(db, client):
+    seed(db)
+    response = client.post('/orders/bulk', json=[
+        {"user_id": 1, "product_ids": [1, 2, 2]},
+        {"user_id": 99, "product_ids": [1]},
+        {"user_id": 1, "product_ids": [999]},
+        {"user_id": True, "product_ids": [True]},
+        "not an order",
+        {"user_id": 2, "product_ids": [3]},
+    ])
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert [item["index"] for item in body["created"]] == [0, 5]
+    assert body["errors"] == [
+        {"index": 1, "error": "User not found"},
+        {"index": 2, "error": "Products not found: [999]"},
+        {"index": 3, "error": "Missing user_id or product_ids"},
+        {"index": 4, "error": "Missing user_id or product_ids"},
+    ]
+    with db.get_session() as session:
+        assert session.query(db.Association).count() == 3
+
+
+def test_bulk_rejects_empty_and_oversized_batches(client):
+    assert client.post('/orders/bulk', json=[]).status_code == 400
+    oversized = [{"user_id": 1, "product_ids": [1]}] * 1001
+    assert client.post('/orders/bulk', json=oversized).status_code == 400
+
+
+def test_bulk_limits_products_per_order(db, client):
+    seed(db, products=db.MAX_ORDER_PRODUCTS + 1)
+    all_products = list(range(1, db.MAX_ORDER_PRODUCTS + 2))
+
+    response = client.post('/orders/bulk', json=[
+        {"user_id": 1, "product_ids": all_products},
+        {"user_id": 1, "product_ids": all_products[:db.MAX_ORDER_PRODUCTS]},
+    ])
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert body["errors"] == [{"index": 0, "error": f"At most {db.MAX_ORDER_PRODUCTS} products per order"}]
+    assert [item["index"] for item in body["created"]] == [1]
@@ -0,0 +1,126 @@
+import asyncio
+import fnmatch
+import sys
+import types
+
+import pytest
+
+from conftest import seed
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the subset of the redis client RedisCache uses."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+
+    def get(self, key):
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= self.clock():
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value, self.clock() + ex if ex else None)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+    def info(self, section):
+        return {"evicted_keys": 0}
+
+
+@pytest.fixture
+def redis_cache(db, monkeypatch):
+    now = [0]
+    cache = db.RedisCache(FakeRedis(lambda: now[0]), ttl=10)
+    monkeypatch.setattr(db, 'product_cache', cache)
+    cache.now = now
+    return cache
+
+
+def test_product_cache_hits_and_invalidation(db, client):
+    seed(db, products=2)
+
+    client.get('/products/1')
+    client.get('/products?limit=10')
+    hits_before = db.product_cache.hits
+    assert client.get('/products/1').get_json()["price"] == 1.0
+    assert client.get('/products?limit=10').status_code == 200
+    assert db.product_cache.hits == hits_before + 2
+
+    client.put('/products/1', json={"product_name": "renamed", "price": 9.5})
+    assert client.get('/products/1').get_json() == {"id": 1, "price": 9.5, "product_name": "renamed"}
+    assert client.get('/products?limit=10').get_json()[0]["price"] == 9.5
+
+    client.post('/products', json={"product_name": "new", "price": 2.0})
+    assert len(client.get('/products?limit=10').get_json()) == 3
+
+    client.delete('/products/3')
+    assert client.get('/products/3').status_code == 404
+    assert len(client.get('/products?limit=10').get_json()) == 2
+
+
+def test_lru_cache_evicts_and_expires():
+    from app import LRUCache
+
+    now = [0]
+    cache = LRUCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    cache.get('a')
+    cache.set('c', b'3')
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1'
+    now[0] = 11
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+
+
+def test_redis_cache_hits_and_invalidation(db, client, redis_cache):
+    seed(db, products=2)
+
+    client.get('/products/1')
+    client.get('/products?limit=10')
+    assert 'ecommerce:products:1' in redis_cache.client.data
+    assert client.get('/products/1').get_json()["price"] == 1.0
+    assert client.get('/products?limit=10').status_code == 200
+    assert redis_cache.hits == 2
+
+    client.put('/products/1', json={"product_name": "renamed", "price": 9.5})
+    assert list(redis_cache.client.data) == []
+    assert client.get('/products?limit=10').get_json()[0]["price"] == 9.5
+
+    redis_cache.now[0] = 11
+    assert redis_cache.get('products:list:None:10') is None
+    assert client.get('/cache/stats').get_json()["products"]["backend"] == "redis"
+
+
+def test_create_cache_picks_backend_from_url(db, monkeypatch):
+    fake_redis = types.ModuleType('redis')
+    fake_redis.Redis = types.SimpleNamespace(from_url=lambda url: FakeRedis(lambda: 0))
+    monkeypatch.setitem(sys.modules, 'redis', fake_redis)
+
+    assert isinstance(db.create_cache('memory', maxsize=5, ttl=1), db.LRUCache)
+    assert isinstance(db.create_cache('redis://localhost:6379/0'), db.RedisCache)
+    with pytest.raises(ValueError):
+        db.create_cache('memcached://localhost')
+
+
+def test_async_app_uses_replaced_cache(db, redis_cache):
+    asgi = pytest.importorskip('asgi')
+    redis_cache.set('products:1', b'{"cached":true}')
+
+    async def get():
+        response = await asgi.app.test_client().get('/products/1')
+        return await response.get_data()
+
+    assert asyncio.run(get()) == b'{"cached":true}'
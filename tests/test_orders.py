@@ -0,0 +1,92 @@
+import pytest
+
+from conftest import seed
+
+
+def create_orders(client, count, products_per_order):
+    payload = [{"user_id": index % 3 + 1, "product_ids": list(range(1, products_per_order + 1))}
+               for index in range(count)]
+    response = client.post('/orders/bulk', json=payload)
+    assert response.status_code == 201
+    return response.get_json()["created"]
+
+
+@pytest.mark.parametrize('orders, products_per_order', [(2, 1), (20, 5), (60, 10)])
+def test_expand_products_and_user_uses_two_queries(db, client, count_queries, orders, products_per_order):
+    seed(db)
+    create_orders(client, orders, products_per_order)
+
+    response, queries = count_queries(client.get, '/orders?expand=products,user&limit=50')
+
+    assert response.status_code == 200
+    page = response.get_json()
+    assert len(page) == min(orders, 50)
+    assert all(len(order["products"]) == products_per_order for order in page)
+    assert all(order["user"]["id"] == order_index % 3 + 1 for order_index, order in enumerate(page))
+    assert queries == 2
+
+
+@pytest.mark.parametrize('orders', [1, 30])
+def test_expand_user_uses_one_query(db, client, count_queries, orders):
+    seed(db)
+    create_orders(client, orders, 3)
+
+    response, queries = count_queries(client.get, '/orders?expand=user')
+
+    assert response.status_code == 200
+    assert len(response.get_json()) == orders
+    assert queries == 1
+
+
+def test_expand_single_order_includes_total(db, client, count_queries):
+    seed(db)
+    create_orders(client, 1, 4)
+
+    response, queries = count_queries(client.get, '/orders/1?expand=products,user')
+
+    order = response.get_json()
+    assert [product["id"] for product in order["products"]] == [1, 2, 3, 4]
+    assert order["total"] == 1.0 + 2.0 + 3.0 + 4.0
+    assert queries == 2
+
+
+def test_expand_rejects_unknown_relationship(client):
+    assert client.get('/orders?expand=bogus').status_code == 400
+
+
+def test_expand_next_link_keeps_expand(db, client):
+    seed(db)
+    create_orders(client, 3, 1)
+
+    response = client.get('/orders?expand=user&limit=2')
+
+    assert response.headers['X-Next-Cursor'] == '2'
+    assert 'expand=user' in response.headers['Link']
+
+
+def test_expand_products_alone_uses_two_queries(db, client, count_queries):
+    seed(db)
+    create_orders(client, 12, 3)
+
+    response, queries = count_queries(client.get, '/orders?expand=products&limit=5&after=5')
+
+    page = response.get_json()
+    assert [order["id"] for order in page] == [6, 7, 8, 9, 10]
+    assert all("user" not in order and order["total"] == 6.0 for order in page)
+    assert queries == 2
+
+
+def test_expand_orders_without_products(db, client, count_queries):
+    seed(db)
+    with db.get_session() as session:
+        session.add_all([db.Order(user_id=1), db.Order(user_id=2)])
+        session.commit()
+
+    response, queries = count_queries(client.get, '/orders?expand=products,user')
+
+    assert [(order["products"], order["total"]) for order in response.get_json()] == [([], 0.0), ([], 0.0)]
+    assert queries == 2
+
+
+def test_expand_cannot_be_streamed(client):
+    assert client.get('/orders?expand=user&stream=ndjson').status_code == 400
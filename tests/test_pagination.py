@@ -0,0 +1,75 @@
+from conftest import seed
+
+
+def test_list_pages_follow_cursor(db, client):
+    seed(db, products=25)
+
+    seen, url = [], '/products?limit=10'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        seen += [product["id"] for product in response.get_json()]
+        link = response.headers.get('Link')
+        url = link[1:link.index('>')].replace('http://localhost', '') if link else None
+
+    assert seen == list(range(1, 26))
+
+
+def test_list_cursor_headers(db, client):
+    seed(db, products=5)
+
+    first = client.get('/products?limit=2')
+    last = client.get('/products?after=3&limit=2')
+
+    assert first.headers['X-Next-Cursor'] == '2'
+    assert [product["id"] for product in last.get_json()] == [4, 5]
+    assert 'X-Next-Cursor' not in last.headers
+
+
+def test_list_rejects_bad_page_arguments(client):
+    assert client.get('/products?limit=0').status_code == 400
+    assert client.get('/products?limit=1001').status_code == 400
+    assert client.get('/products?after=abc').status_code == 400
+
+
+def test_stream_formats(db, client):
+    seed(db, products=3)
+
+    ndjson = client.get('/products?stream=ndjson&after=1')
+    assert ndjson.mimetype == 'application/x-ndjson'
+    assert ndjson.data.count(b'\n') == 2
+
+    array = client.get('/products?stream=json')
+    assert [product["id"] for product in array.get_json()] == [1, 2, 3]
+    assert client.get('/products?stream=json&after=100').data == b'[]'
+
+
+def test_stream_reads_keyset_batches(db, client, count_queries, monkeypatch):
+    seed(db, products=25)
+    monkeypatch.setattr(db, 'STREAM_BATCH_SIZE', 10)
+
+    response, queries = count_queries(lambda: client.get('/products?stream=ndjson&after=2').data)
+
+    assert [int(line.split(b'"id":')[1].split(b',')[0]) for line in response.splitlines()] == list(range(3, 26))
+    # Batches of 10, 10 and a short one of 3 that ends the stream
+    assert queries == 3
+
+
+def test_stream_limit_stops_mid_batch(db, client, count_queries, monkeypatch):
+    seed(db, products=25)
+    monkeypatch.setattr(db, 'STREAM_BATCH_SIZE', 10)
+
+    response, queries = count_queries(lambda: client.get('/products?stream=json&limit=15').get_json())
+
+    assert [product["id"] for product in response] == list(range(1, 16))
+    assert queries == 2
+
+
+def test_stream_orders_by_user(db, client, monkeypatch):
+    seed(db, users=2, products=2)
+    monkeypatch.setattr(db, 'STREAM_BATCH_SIZE', 2)
+    client.post('/orders/bulk', json=[{"user_id": index % 2 + 1, "product_ids": [1]} for index in range(7)])
+
+    response = client.get('/users/1/orders?stream=json')
+
+    assert [order["id"] for order in response.get_json()] == [1, 3, 5, 7]
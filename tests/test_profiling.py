@@ -0,0 +1,108 @@
+import pytest
+from flask import Flask, Response, stream_with_context
+from sqlalchemy import create_engine
+from sqlalchemy.orm import declarative_base
+
+import profiling
+
+
+@pytest.fixture
+def profiled_app():
+    app = Flask(__name__)
+    app.config['PROPAGATE_EXCEPTIONS'] = False
+    profiler = profiling.Profiler(enabled=True, sample_rate=1.0, slowest=5)
+    profiler.init_app(app, create_engine('sqlite://'), declarative_base())
+    held = []
+
+    @app.route('/ok')
+    def ok():
+        held.append(profiling._cprofile_lock.locked())
+        return 'ok'
+
+    @app.route('/stream')
+    def stream():
+        def generate():
+            held.append(profiling._cprofile_lock.locked())
+            profiler.add_rows(2)
+            yield 'streamed'
+        return Response(stream_with_context(profiler.stream(generate())))
+
+    @app.route('/fail')
+    def fail():
+        raise RuntimeError('boom')
+
+    return app, profiler, held
+
+
+def test_sampled_request_releases_cprofile(profiled_app):
+    app, profiler, held = profiled_app
+
+    response = app.test_client().get('/ok')
+
+    assert 'total;dur=' in response.headers['Server-Timing']
+    assert held == [True]
+    assert not profiling._cprofile_lock.locked()
+    assert [entry["route"] for entry in profiler.stats()["slowest"]] == ['GET /ok']
+
+
+def test_sampled_stream_is_recorded_once(profiled_app):
+    app, profiler, _ = profiled_app
+
+    assert app.test_client().get('/stream').data == b'streamed'
+
+    assert not profiling._cprofile_lock.locked()
+    stats = profiler.stats()["routes"]["GET /stream"]
+    assert (stats["count"], stats["rows"]) == (1, 2)
+
+
+def test_failed_request_releases_cprofile(profiled_app):
+    app, profiler, _ = profiled_app
+
+    assert app.test_client().get('/fail').status_code == 500
+    assert not profiling._cprofile_lock.locked()
+    assert app.test_client().get('/ok').status_code == 200
+
+
+def test_request_skips_cprofile_while_another_is_sampled(profiled_app):
+    app, profiler, _ = profiled_app
+
+    with profiling._cprofile_lock:
+        response = app.test_client().get('/ok')
+
+    assert response.status_code == 200
+    assert profiler.stats()["routes"]["GET /ok"]["count"] == 1
+    assert profiler.stats()["slowest"] == []
+
+
+@pytest.fixture
+def app_profile(db):
+    from conftest import seed
+
+    seed(db, products=5)
+    db.profiler.routes.clear()
+    return lambda route: db.profiler.stats()["routes"][route]
+
+
+def test_streamed_response_counts_sql_and_rows(db, client, app_profile, monkeypatch):
+    monkeypatch.setattr(db, 'STREAM_BATCH_SIZE', 2)
+
+    response = client.get('/products?stream=ndjson')
+    assert len(response.data.splitlines()) == 5
+
+    stats = app_profile('GET /products')
+    assert stats["sql_statements"] == 3
+    assert stats["rows"] == 5
+
+
+def test_single_row_get_counts_its_row(client, app_profile):
+    client.get('/users/1')
+
+    assert app_profile('GET /users/<int:user_id>')["rows"] == 1
+
+
+def test_jsonify_paths_are_timed(client, app_profile):
+    created = client.post('/products', json={"product_name": "p", "price": 1.0})
+    expanded = client.get('/orders?expand=user')
+
+    assert 'encode;dur=' in created.headers['Server-Timing']
+    assert 'encode;dur=' in expanded.headers['Server-Timing']
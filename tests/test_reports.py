@@ -0,0 +1,103 @@
+import datetime
+
+from conftest import seed
+
+GROUPS = ('day', 'product', 'user')
+
+
+def assert_rollup_matches_live(client):
+    for group_by in GROUPS:
+        rollup = client.get(f'/reports/sales?group_by={group_by}').get_json()
+        live = client.get(f'/reports/sales?group_by={group_by}&source=live').get_json()
+        assert rollup == live, group_by
+
+
+def test_rollup_matches_live_report_after_every_write(db, client):
+    seed(db, users=3, products=5)
+
+    client.post('/orders', json={"user_id": 1, "product_ids": [1, 2]})
+    assert_rollup_matches_live(client)
+
+    client.post('/orders/bulk', json=[
+        {"user_id": 2, "product_ids": [2, 3, 4]},
+        {"user_id": 3, "product_ids": [5]},
+        {"user_id": 1, "product_ids": [1, 5]},
+        {"user_id": 2, "product_ids": [4]},
+    ])
+    assert_rollup_matches_live(client)
+
+    client.delete('/orders/2')
+    assert_rollup_matches_live(client)
+
+    yesterday = (datetime.datetime.now() - datetime.timedelta(days=1)).isoformat(timespec='seconds')
+    assert client.put('/orders/3', json={"order_date": yesterday}).status_code == 200
+    assert_rollup_matches_live(client)
+
+    client.put('/products/5', json={"product_name": "product 4", "price": 12.5})
+    assert_rollup_matches_live(client)
+
+    assert client.delete('/products/5').status_code == 200
+    assert_rollup_matches_live(client)
+    assert 5 not in [row["product_id"] for row in client.get('/reports/sales?group_by=product').get_json()]
+
+    client.delete('/products/4')
+    assert_rollup_matches_live(client)
+
+    with db.get_session() as session:
+        db.rebuild_sales_rollup(session)
+        session.commit()
+    assert_rollup_matches_live(client)
+
+
+def test_product_and_order_deleted_in_one_flush(db, client):
+    seed(db, users=1, products=2)
+    client.post('/orders/bulk', json=[{"user_id": 1, "product_ids": [1, 2]}, {"user_id": 1, "product_ids": [2]}])
+
+    with db.get_session() as session:
+        session.delete(session.get(db.Order, 1))
+        session.delete(session.get(db.Product, 2))
+        session.commit()
+
+    assert_rollup_matches_live(client)
+    assert client.get('/reports/sales').get_json()[0]["orders"] == 1
+
+
+def test_price_set_on_expired_product(db, client):
+    seed(db, users=1, products=2)
+    client.post('/orders', json={"user_id": 1, "product_ids": [1, 2]})
+
+    with db.get_session() as session:
+        product = session.get(db.Product, 2)
+        session.commit()
+        product.price = 50.0
+        session.commit()
+
+    assert_rollup_matches_live(client)
+    assert client.get('/reports/sales').get_json()[0]["revenue"] == 51.0
+
+
+def test_order_products_changed_through_the_orm(db, client):
+    seed(db, users=2, products=4)
+    client.post('/orders/bulk', json=[{"user_id": 1, "product_ids": [1, 2]}, {"user_id": 2, "product_ids": [3]}])
+
+    with db.get_session() as session:
+        order = session.get(db.Order, 1)
+        order.products.remove(session.get(db.Product, 1))
+        order.products.append(session.get(db.Product, 3))
+        session.commit()
+    assert_rollup_matches_live(client)
+
+    with db.get_session() as session:
+        product = session.get(db.Product, 4)
+        product.orders.append(session.get(db.Order, 2))
+        product.price = 7.0
+        session.commit()
+    assert_rollup_matches_live(client)
+
+    with db.get_session() as session:
+        order = session.get(db.Order, 2)
+        order.products.append(db.Product(product_name='new', price=3.0))
+        order.user_id = 1
+        order.products.remove(session.get(db.Product, 3))
+        session.commit()
+    assert_rollup_matches_live(client)
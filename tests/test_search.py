@@ -0,0 +1,79 @@
+import base64
+import json
+
+import pytest
+
+
+def search_ids(client, **params):
+    response = client.get('/products/search', query_string=params)
+    assert response.status_code == 200
+    return [product["id"] for product in response.get_json()]
+
+
+def test_search_fallback_matches_word_prefixes_like_the_index(db, client, monkeypatch):
+    with db.get_session() as session:
+        session.add_all(db.Product(product_name=name, price=1.0) for name in
+                        ('red shirt', 'Shirt red', 'washed jeans', 'short sleeve', 'blue sock'))
+        session.commit()
+
+    indexed = search_ids(client, q='sh re')
+    monkeypatch.setattr(db, 'MAX_SEARCH_CANDIDATES', 0)
+    fallback = search_ids(client, q='sh re')
+
+    assert indexed == fallback == [1, 2]
+
+
+def test_search_index_rebuilds_in_one_thread_only(db):
+    now = [0]
+    index = db.ProductSearchIndex(ttl=10, clock=lambda: now[0])
+    with db.get_session() as session:
+        session.add(db.Product(product_name='red shirt', price=1.0))
+        session.commit()
+        index.ensure_built(session)
+        session.add(db.Product(product_name='red sock', price=1.0))
+        session.commit()
+
+        now[0] = 11
+        with index._build_lock:
+            # Another thread is rebuilding, keep serving the old snapshot
+            index.ensure_built(session)
+        assert index.search('red', 100) == {1}
+
+        index.ensure_built(session)
+        assert index.search('red', 100) == {1, 2}
+
+
+def cursor(value, product_id):
+    return base64.urlsafe_b64encode(json.dumps([value, product_id]).encode()).decode()
+
+
+def test_search_pages_through_every_sort(db, client):
+    with db.get_session() as session:
+        session.add_all(db.Product(product_name=f'item {index % 4}', price=float(index % 3)) for index in range(10))
+        session.commit()
+
+    for sort in db.SEARCH_SORTS:
+        seen, after = [], None
+        while True:
+            response = client.get('/products/search', query_string={"sort": sort, "limit": 3, "after": after})
+            seen += [product["id"] for product in response.get_json()]
+            after = response.headers.get('X-Next-Cursor')
+            if after is None:
+                break
+        assert sorted(seen) == list(range(1, 11)), sort
+
+
+@pytest.mark.parametrize('sort, after', [
+    ('name', cursor({"a": 1}, 2)),
+    ('name', cursor(1.5, 2)),
+    ('price', cursor('1.5', 2)),
+    ('price', cursor(True, 2)),
+    ('id', cursor(1.5, 2)),
+    ('id', cursor(1, '2')),
+    ('name', base64.urlsafe_b64encode(b'{"a": 1}').decode()),
+    ('name', 'not base64!'),
+])
+def test_search_rejects_mismatched_cursors(db, client, sort, after):
+    response = client.get('/products/search', query_string={"sort": sort, "after": after})
+
+    assert response.status_code == 400
@@ -0,0 +1,50 @@
+from flask import jsonify
+from sqlalchemy import select
+
+
+def test_serializer_output_matches_marshmallow(db, client):
+    with db.get_session() as session:
+        session.add_all([
+            db.Product(product_name='café "quoted" ☃', price=1 / 3),
+            db.Product(product_name='no price', price=None),
+        ])
+        session.add(db.User(name='üser', email='u@example.com'))
+        session.commit()
+    client.post('/orders/bulk', json=[{"user_id": 1, "product_ids": [1]}])
+
+    for path, model, schema in (('/products', db.Product, db.ProductSchema),
+                                ('/users', db.User, db.UserSchema),
+                                ('/orders', db.Order, db.OrderSchema)):
+        with db.get_session() as session:
+            objects = session.query(model).order_by(model.id).all()
+            with db.app.app_context():
+                expected = jsonify(schema(many=True).dump(objects)).get_data()
+                single = jsonify(schema().dump(objects[0])).get_data()
+        assert client.get(path).data == expected
+        assert client.get(f'{path}/1').data == single
+
+
+def test_row_serializer_matches_schema_dump(db):
+    with db.get_session() as session:
+        session.add(db.User(name='a', email='a@example.com', address=None))
+        session.add(db.Product(product_name='b', price=2))
+        session.flush()
+        session.add(db.Order(user_id=1))
+        session.commit()
+
+        for model, schema, serializer in ((db.User, db.user_schema, db.user_serializer),
+                                          (db.Product, db.product_schema, db.product_serializer),
+                                          (db.Order, db.order_schema, db.order_serializer)):
+            row = session.execute(select(*serializer.columns)).first()
+            assert serializer.dump(row) == schema.dump(session.get(model, 1))
+            assert list(serializer.dump(row)) == sorted(schema.dump_fields)
+
+
+def test_ndjson_lines_match_single_responses(db, client):
+    with db.get_session() as session:
+        session.add_all([db.Product(product_name='ünïcode', price=0.1 + 0.2), db.Product(product_name='x', price=None)])
+        session.commit()
+
+    lines = client.get('/products?stream=ndjson').data.splitlines(keepends=True)
+
+    assert lines == [client.get('/products/1').data, client.get('/products/2').data]